@@ -9,6 +9,8 @@ Magic constant = n(n² + 1) / 2
 """
 
 import argparse
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -17,63 +19,75 @@ def magic_constant(n: int) -> int:
     return n * (n * n + 1) // 2
 
 
-def generate_fzn(n: int, output_file: Path) -> None:
-    """Generate FlatZinc file for magic square of order n."""
+def render_fzn(n: int) -> str:
+    """Render the FlatZinc model for a magic square of order n."""
     mc = magic_constant(n)
     n2 = n * n
 
-    with open(output_file, 'w') as f:
-        f.write(f"% Magic Square of order {n}\n")
-        f.write(f"% Magic constant: {mc}\n")
-        f.write(f"% Variables: x_i_j for i,j in 0..{n-1}\n\n")
+    parts = []
+    a = parts.append
 
-        # Variable declarations
-        # x[i][j] = cell at row i, column j (0-indexed)
-        for i in range(n):
-            for j in range(n):
-                f.write(f"var 1..{n2}: x_{i}_{j} :: output_var;\n")
+    a(f"% Magic Square of order {n}\n")
+    a(f"% Magic constant: {mc}\n")
+    a(f"% Variables: x_i_j for i,j in 0..{n-1}\n\n")
 
-        f.write("\n")
+    # Cell names, formatted once and shared by every block below
+    # x[i][j] = cell at row i, column j (0-indexed)
+    cells = [[f"x_{i}_{j}" for j in range(n)] for i in range(n)]
 
-        # All different constraint
-        all_vars = ", ".join(f"x_{i}_{j}" for i in range(n) for j in range(n))
-        f.write(f"% All cells must have different values\n")
-        f.write(f"constraint all_different_int([{all_vars}]);\n\n")
+    # Every sum constraint shares the same all-ones coefficient list
+    coeffs = ", ".join(["1"] * n)
 
-        # Row constraints
-        f.write(f"% Row sums = {mc}\n")
-        for i in range(n):
-            row_vars = ", ".join(f"x_{i}_{j}" for j in range(n))
-            coeffs = ", ".join(["1"] * n)
-            f.write(f"constraint int_lin_eq([{coeffs}], [{row_vars}], {mc});\n")
+    def sum_eq(line: Iterable[str]) -> str:
+        return f"constraint int_lin_eq([{coeffs}], [{', '.join(line)}], {mc});\n"
 
-        f.write("\n")
+    # Variable declarations
+    a("".join(f"var 1..{n2}: {x} :: output_var;\n" for row in cells for x in row))
 
-        # Column constraints
-        f.write(f"% Column sums = {mc}\n")
-        for j in range(n):
-            col_vars = ", ".join(f"x_{i}_{j}" for i in range(n))
-            coeffs = ", ".join(["1"] * n)
-            f.write(f"constraint int_lin_eq([{coeffs}], [{col_vars}], {mc});\n")
+    a("\n")
 
-        f.write("\n")
+    # All different constraint
+    all_vars = ", ".join(x for row in cells for x in row)
+    a(f"% All cells must have different values\n")
+    a(f"constraint all_different_int([{all_vars}]);\n\n")
 
-        # Diagonal constraints
-        f.write(f"% Main diagonal sum = {mc}\n")
-        main_diag_vars = ", ".join(f"x_{i}_{i}" for i in range(n))
-        coeffs = ", ".join(["1"] * n)
-        f.write(f"constraint int_lin_eq([{coeffs}], [{main_diag_vars}], {mc});\n")
+    # Row constraints
+    a(f"% Row sums = {mc}\n")
+    a("".join(sum_eq(row) for row in cells))
 
-        f.write(f"\n% Anti-diagonal sum = {mc}\n")
-        anti_diag_vars = ", ".join(f"x_{i}_{n-1-i}" for i in range(n))
-        f.write(f"constraint int_lin_eq([{coeffs}], [{anti_diag_vars}], {mc});\n")
+    a("\n")
 
-        f.write("\n")
+    # Column constraints
+    a(f"% Column sums = {mc}\n")
+    a("".join(sum_eq(col) for col in zip(*cells)))
 
-        # Solve
-        f.write("solve satisfy;\n")
+    a("\n")
 
-    print(f"Generated: {output_file} (n={n}, magic_constant={mc})")
+    # Diagonal constraints
+    a(f"% Main diagonal sum = {mc}\n")
+    a(sum_eq([cells[i][i] for i in range(n)]))
+
+    a(f"\n% Anti-diagonal sum = {mc}\n")
+    a(sum_eq([cells[i][n-1-i] for i in range(n)]))
+
+    a("\n")
+
+    # Solve
+    a("solve satisfy;\n")
+
+    return "".join(parts)
+
+
+def generate_fzn(n: int, output_file: Path) -> str:
+    """Generate FlatZinc file for magic square of order n and return a status line."""
+    mc = magic_constant(n)
+    data = render_fzn(n).encode("ascii")
+    if output_file.exists() and output_file.read_bytes() == data:
+        return f"Unchanged: {output_file} (n={n}, magic_constant={mc})"
+
+    output_file.write_bytes(data)
+
+    return f"Generated: {output_file} (n={n}, magic_constant={mc})"
 
 
 def main():
@@ -95,12 +109,16 @@ def main():
 
     sizes = list(configs.keys()) if args.size == "all" else [args.size]
 
-    for size in sizes:
-        cfg = configs[size]
-        n = cfg["n"]
+    # Only the file I/O can overlap here (rendering holds the GIL); report in order
+    with ThreadPoolExecutor(max_workers=len(sizes)) as ex:
+        statuses = list(ex.map(
+            lambda size: generate_fzn(configs[size]["n"], args.output_dir / f"magic_square_{size}.fzn"),
+            sizes,
+        ))
 
-        output_file = args.output_dir / f"magic_square_{size}.fzn"
-        generate_fzn(n, output_file)
+    for size, status in zip(sizes, statuses):
+        n = configs[size]["n"]
+        print(status)
 
         mc = magic_constant(n)
         print(f"  {size.upper()}: {n}x{n} grid, values 1..{n*n}, magic constant = {mc}")
@@ -10,9 +10,12 @@ Examples:
     ./run_single.py hitori h5-1 --solver sabori
     ./run_single.py fbd1 --timeout 60
 """
+import os
+import re
+import signal
 import subprocess
 import sys
-import re
+import threading
 import argparse
 from pathlib import Path
 
@@ -20,14 +23,22 @@ BASE_DIR = Path(__file__).resolve().parent
 MINIZINC = "/snap/bin/minizinc"
 SABORI_MSC = str(Path(__file__).resolve().parent.parent.parent / "build" / "share" / "minizinc" / "solvers" / "sabori_csp.msc")
 DEFAULT_TIMEOUT = 30
+_NUM_RE = re.compile(r'([0-9]+)')
 
 def natural_sort_key(s):
-    return [int(t) if t.isdigit() else t.lower() for t in re.split('([0-9]+)', str(s))]
+    return [int(t) if t.isdigit() else t.lower() for t in _NUM_RE.split(str(s))]
 
 def find_files(prob_dir):
-    mzn_files = sorted(prob_dir.glob("*.mzn"), key=natural_sort_key)
-    dzn_files = sorted(prob_dir.glob("*.dzn"), key=natural_sort_key)
-    json_files = sorted(prob_dir.glob("*.json"), key=natural_sort_key)
+    # ディレクトリは1回だけ走査し、拡張子ごとに振り分ける
+    by_suffix = {".mzn": [], ".dzn": [], ".json": []}
+    # glob("*.ext") と同じ判定 (ドットファイルも含む) にするため名前末尾で振り分ける
+    for p in prob_dir.iterdir():
+        ext = p.name[p.name.rfind("."):] if "." in p.name else ""
+        if ext in by_suffix:
+            by_suffix[ext].append(p)
+    mzn_files = sorted(by_suffix[".mzn"], key=natural_sort_key)
+    dzn_files = sorted(by_suffix[".dzn"], key=natural_sort_key)
+    json_files = sorted(by_suffix[".json"], key=natural_sort_key)
     return mzn_files[0] if mzn_files else None, dzn_files, json_files
 
 def run_solver(solver_name, solver_id, mzn, dzn, timeout):
@@ -41,15 +52,48 @@ def run_solver(solver_name, solver_id, mzn, dzn, timeout):
     print(f"Timeout: {timeout}s")
     print('='*60)
 
+    # stdout は届いた行から順に表示する (全出力をメモリに溜めない)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, bufsize=1, start_new_session=True)
+    stderr_lines = []
+    stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(proc.stderr), daemon=True)
+    stderr_reader.start()
+
+    timed_out = threading.Event()
+
+    def kill_group():
+        # minizinc が起動したソルバーごとプロセスグループを止める
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            return False
+        return True
+
+    def on_timeout():
+        # minizinc 本体が終了済みでも子ソルバーが残っていればグループは生きている。
+        # グループが既に空 (正常終了と競合) ならタイムアウト扱いにしない
+        if kill_group():
+            timed_out.set()
+
+    timer = threading.Timer(timeout, on_timeout)
+    timer.start()
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-        print(result.stdout)
-        if result.stderr:
-            print(f"[stderr]\n{result.stderr}")
-        return result.returncode
-    except subprocess.TimeoutExpired:
+        for line in proc.stdout:
+            print(line, end='', flush=True)
+        returncode = proc.wait()
+    finally:
+        timer.cancel()
+        # Ctrl-C 等の例外時も新しいセッションに残ったソルバーを孤立させない
+        kill_group()
+        proc.wait()
+    stderr_reader.join()
+
+    if timed_out.is_set():
         print(f"[TIMEOUT after {timeout}s]")
         return -1
+    if stderr_lines:
+        print(f"[stderr]\n{''.join(stderr_lines)}")
+    return returncode
 
 def main():
     parser = argparse.ArgumentParser(description='Run single MiniZinc problem')
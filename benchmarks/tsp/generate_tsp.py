@@ -7,118 +7,126 @@ Uses circuit constraint to form a Hamiltonian cycle and int_element for distance
 
 import argparse
 import random
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
 
 
 def generate_distance_matrix(n: int, seed: int, max_dist: int = 100) -> list[list[int]]:
     """Generate a random symmetric distance matrix."""
-    random.seed(seed)
-    dist = [[0] * n for _ in range(n)]
-    for i in range(n):
-        for j in range(i + 1, n):
-            d = random.randint(1, max_dist)
-            dist[i][j] = d
-            dist[j][i] = d
-    return dist
+    # Local generator: same stream as random.seed(seed), without touching global state
+    randint = random.Random(seed).randint
+    # Draw the upper triangle row by row in one pass, then mirror it
+    upper = [[randint(1, max_dist) for _ in range(i + 1, n)] for i in range(n)]
+    return [[upper[i][j - i - 1] for i in range(j)] + [0] + upper[j] for j in range(n)]
 
 
 def compute_greedy_upper_bound(n: int, dist: list[list[int]]) -> int:
     """Compute a greedy upper bound for TSP (nearest neighbor heuristic)."""
-    visited = [False] * n
+    unvisited = list(range(1, n))
     current = 0
-    visited[0] = True
     total = 0
 
     for _ in range(n - 1):
-        best_next = -1
-        best_dist = float('inf')
-        for j in range(n):
-            if not visited[j] and dist[current][j] < best_dist:
-                best_dist = dist[current][j]
-                best_next = j
-        total += best_dist
+        # min() keeps the first (lowest-index) city on ties
+        row = dist[current]
+        best_next = min(unvisited, key=row.__getitem__)
+        total += row[best_next]
         current = best_next
-        visited[current] = True
+        unvisited.remove(current)
 
     # Return to start
     total += dist[current][0]
     return total
 
 
-def generate_fzn(n: int, dist: list[list[int]], bound: int, output_file: Path) -> None:
-    """Generate FlatZinc file for TSP instance."""
+def render_fzn(n: int, dist: list[list[int]], bound: int) -> str:
+    """Render the FlatZinc model for a TSP instance."""
 
     # Flatten distance matrix (1-based indexing for FlatZinc)
     # dist_flat[i*n + j + 1] = dist[i][j]
-    dist_flat = []
-    for i in range(n):
-        for j in range(n):
-            dist_flat.append(dist[i][j])
+    # Distances repeat heavily, so format each distinct value only once
+    labels = {v: str(v) for v in set(chain.from_iterable(dist))}
+    dist_flat = ", ".join(map(labels.__getitem__, chain.from_iterable(dist)))
 
-    with open(output_file, 'w') as f:
-        f.write(f"% TSP instance: n={n}, bound={bound}\n")
-        f.write(f"% Distance matrix (flattened, 1-based index: dist_flat[i*n + j + 1] = dist[i][j])\n\n")
+    parts = []
+    a = parts.append
 
-        # Distance array declaration
-        f.write(f"array [1..{n*n}] of int: dist_flat = [{', '.join(map(str, dist_flat))}];\n\n")
+    a(f"% TSP instance: n={n}, bound={bound}\n")
+    a(f"% Distance matrix (flattened, 1-based index: dist_flat[i*n + j + 1] = dist[i][j])\n\n")
 
-        # Variables: next[i] is the next city after city i (0-indexed for circuit)
-        for i in range(n):
-            f.write(f"var 0..{n-1}: next_{i} :: output_var;\n")
+    # Distance array declaration
+    a(f"array [1..{n*n}] of int: dist_flat = [{dist_flat}];\n\n")
 
-        f.write("\n")
+    # Variables: next[i] is the next city after city i (0-indexed for circuit)
+    a("".join(f"var 0..{n-1}: next_{i} :: output_var;\n" for i in range(n)))
 
-        # Variables: edge_cost[i] is the distance from city i to next[i]
-        # Find min and max possible edge costs
-        min_edge = min(dist[i][j] for i in range(n) for j in range(n) if i != j)
-        max_edge = max(dist[i][j] for i in range(n) for j in range(n))
+    a("\n")
 
-        for i in range(n):
-            f.write(f"var {min_edge}..{max_edge}: edge_cost_{i};\n")
+    # Variables: edge_cost[i] is the distance from city i to next[i]
+    # Find min and max possible edge costs
+    off_diag = list(chain.from_iterable(row[:i] + row[i + 1:] for i, row in enumerate(dist)))
+    min_edge, max_edge = min(off_diag), max(off_diag)
 
-        f.write("\n")
+    a("".join(f"var {min_edge}..{max_edge}: edge_cost_{i};\n" for i in range(n)))
 
-        # Index variables for int_element
-        for i in range(n):
-            base_idx = i * n + 1  # 1-based start for row i
-            f.write(f"var {base_idx}..{base_idx + n - 1}: idx_{i};\n")
+    a("\n")
 
-        f.write("\n")
+    # Index variables for int_element
+    # base_idx[i] = i*n + 1 is the 1-based start of row i in dist_flat
+    base_idx = range(1, n * n + 1, n)
+    a("".join(f"var {b}..{b + n - 1}: idx_{i};\n" for i, b in enumerate(base_idx)))
 
-        # Total cost variable
-        f.write(f"var {n * min_edge}..{bound}: total_cost :: output_var;\n\n")
+    a("\n")
 
-        # Circuit constraint (0-indexed)
-        next_vars = ", ".join(f"next_{i}" for i in range(n))
-        f.write(f"constraint circuit([{next_vars}]);\n\n")
+    # Total cost variable
+    a(f"var {n * min_edge}..{bound}: total_cost :: output_var;\n\n")
 
-        # Index computation: idx_i = next_i + i*n + 1
-        # Rewrite as: 1*next_i + (-1)*idx_i = -(i*n + 1)
-        f.write("% Index constraints: idx_i = next_i + i*n + 1\n")
-        for i in range(n):
-            base_idx = i * n + 1
-            f.write(f"constraint int_lin_eq([1, -1], [next_{i}, idx_{i}], {-base_idx});\n")
+    # Circuit constraint (0-indexed)
+    next_vars = ", ".join(f"next_{i}" for i in range(n))
+    a(f"constraint circuit([{next_vars}]);\n\n")
 
-        f.write("\n")
+    # Index computation: idx_i = next_i + i*n + 1
+    # Rewrite as: 1*next_i + (-1)*idx_i = -(i*n + 1)
+    a("% Index constraints: idx_i = next_i + i*n + 1\n")
+    a("".join(
+        f"constraint int_lin_eq([1, -1], [next_{i}, idx_{i}], {-b});\n"
+        for i, b in enumerate(base_idx)
+    ))
 
-        # Edge cost constraints: edge_cost_i = dist_flat[idx_i]
-        f.write("% Edge cost constraints: edge_cost_i = dist_flat[idx_i]\n")
-        for i in range(n):
-            f.write(f"constraint array_int_element(idx_{i}, dist_flat, edge_cost_{i});\n")
+    a("\n")
 
-        f.write("\n")
+    # Edge cost constraints: edge_cost_i = dist_flat[idx_i]
+    a("% Edge cost constraints: edge_cost_i = dist_flat[idx_i]\n")
+    a("".join(
+        f"constraint array_int_element(idx_{i}, dist_flat, edge_cost_{i});\n"
+        for i in range(n)
+    ))
 
-        # Total cost constraint: sum(edge_cost_i) = total_cost
-        # Rewrite as: sum(edge_cost_i) - total_cost = 0
-        coeffs = ", ".join(["1"] * n + ["-1"])
-        edge_vars = ", ".join(f"edge_cost_{i}" for i in range(n))
-        f.write(f"% Total cost constraint\n")
-        f.write(f"constraint int_lin_eq([{coeffs}], [{edge_vars}, total_cost], 0);\n\n")
+    a("\n")
 
-        # Solve
-        f.write("solve minimize total_cost;\n")
+    # Total cost constraint: sum(edge_cost_i) = total_cost
+    # Rewrite as: sum(edge_cost_i) - total_cost = 0
+    coeffs = ", ".join(["1"] * n + ["-1"])
+    edge_vars = ", ".join(f"edge_cost_{i}" for i in range(n))
+    a(f"% Total cost constraint\n")
+    a(f"constraint int_lin_eq([{coeffs}], [{edge_vars}, total_cost], 0);\n\n")
 
-    print(f"Generated: {output_file}")
+    # Solve
+    a("solve minimize total_cost;\n")
+
+    return "".join(parts)
+
+
+def generate_fzn(n: int, dist: list[list[int]], bound: int, output_file: Path) -> str:
+    """Generate FlatZinc file for TSP instance and return a status line."""
+    data = render_fzn(n, dist, bound).encode("ascii")
+    if output_file.exists() and output_file.read_bytes() == data:
+        return f"Unchanged: {output_file}"
+
+    output_file.write_bytes(data)
+
+    return f"Generated: {output_file}"
 
 
 def main():
@@ -142,6 +150,7 @@ def main():
 
     sizes = list(configs.keys()) if args.size == "all" else [args.size]
 
+    instances = []
     for size in sizes:
         cfg = configs[size]
         n = cfg["n"]
@@ -153,15 +162,28 @@ def main():
         # Use greedy bound + small margin as the constraint bound
         bound = int(upper_bound * 1.1)
 
-        output_file = args.output_dir / f"tsp_{size}.fzn"
-        generate_fzn(n, dist, bound, output_file)
+        instances.append({
+            "size": size, "n": n, "seed": seed, "dist": dist,
+            "upper_bound": upper_bound, "bound": bound,
+            "output_file": args.output_dir / f"tsp_{size}.fzn",
+        })
+
+    # Only the file I/O can overlap here (rendering holds the GIL); report in order
+    with ThreadPoolExecutor(max_workers=len(instances)) as ex:
+        statuses = list(ex.map(
+            lambda inst: generate_fzn(inst["n"], inst["dist"], inst["bound"], inst["output_file"]),
+            instances,
+        ))
+
+    for inst, status in zip(instances, statuses):
+        print(status)
 
         # Print distance matrix for reference
-        print(f"\n{size.upper()} (n={n}, seed={seed}):")
-        print(f"  Greedy upper bound: {upper_bound}")
-        print(f"  Constraint bound: {bound}")
+        print(f"\n{inst['size'].upper()} (n={inst['n']}, seed={inst['seed']}):")
+        print(f"  Greedy upper bound: {inst['upper_bound']}")
+        print(f"  Constraint bound: {inst['bound']}")
         print(f"  Distance matrix:")
-        for i, row in enumerate(dist):
+        for i, row in enumerate(inst["dist"]):
             print(f"    {i}: {row}")
 
 